@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+"""SpectrumAnalyzer.py: Streaming vibration spectrum of RAW_IMU data."""
+
+import time
+from collections import deque
+import numpy as np
+
+class SpectrumAnalyzer(object):
+
+    """Incremental Welch PSD estimate of the accel and gyro axes"""
+    """Samples are kept in a fixed ring buffer; every `step` samples one
+    windowed segment of all six axes is transformed in a single rfft call
+    and folded into a running average, so memory and per-update cost do not
+    grow with the length of the flight."""
+
+    AXES = ['ax','ay','az','gx','gy','gz']
+    MOTORS = ['m1','m2','m3','m4','m5','m6','m7','m8']
+
+    """Class initialization"""
+    def __init__(self, **kwargs):
+        super(SpectrumAnalyzer, self).__init__()
+        self._window = int(kwargs.get("window", 256))
+        self._overlap = float(kwargs.get("overlap", 0.5))
+        self._averages = int(kwargs.get("averages", 16))
+        self._sample_rate = kwargs.get("sample_rate", None)
+        if self._window < 4:
+            raise ValueError("window must be at least 4 samples")
+        if not 0.0 <= self._overlap < 1.0:
+            raise ValueError("overlap must be in [0, 1)")
+        if self._averages < 1:
+            raise ValueError("averages must be at least 1")
+        self._step = max(1, int(round(self._window * (1.0 - self._overlap))))
+
+        # Each sample is written twice, window apart, so the latest window is
+        # always the contiguous slice buffer[:, pos:pos+window].
+        self._buffer = np.zeros((len(self.AXES), 2 * self._window))
+        self._pos = 0
+        self._filled = 0
+        self._pending = 0
+
+        self._taper = np.hanning(self._window)
+        self._taper_power = float(np.sum(self._taper ** 2))
+        self._psd = np.zeros((len(self.AXES), self._window // 2 + 1))
+        self.segments = 0
+
+        # Sample rate is estimated from arrival times when not given.
+        self._dt = None
+        self._last = None
+
+        # Mean motor output and dominant gyro frequency per segment, kept
+        # bounded for correlating vibration with motor speed.
+        self.motor = 0.0
+        self._history = deque(maxlen=int(kwargs.get("history", 256)))
+
+    @property
+    def sampleRate(self):
+        if self._sample_rate:
+            return float(self._sample_rate)
+        if self._dt:
+            return 1.0 / self._dt
+        return 0.0
+
+    @property
+    def frequencies(self):
+        return np.fft.rfftfreq(self._window, 1.0 / (self.sampleRate or 1.0))
+
+    """Add one rawIMU dict as returned by MultiWii.getData(MultiWii.RAW_IMU)"""
+    def addRawIMU(self, raw_imu, timestamp=None):
+        now = time.time() if timestamp is None else timestamp
+        if self._last is not None and now > self._last:
+            dt = now - self._last
+            self._dt = dt if self._dt is None else 0.95 * self._dt + 0.05 * dt
+        self._last = now
+        self.addSamples([[raw_imu[a] for a in self.AXES]])
+
+    """Add motor outputs as returned by MultiWii.getData(MultiWii.MOTOR)"""
+    def addMotor(self, motor):
+        active = [float(motor[m]) for m in self.MOTORS if float(motor[m]) > 0]
+        if active:
+            self.motor = sum(active) / len(active)
+
+    """Add an (N, 6) block of ax, ay, az, gx, gy, gz samples"""
+    def addSamples(self, samples):
+        samples = np.asarray(samples, dtype=float).reshape(-1, len(self.AXES)).T
+        window = self._window
+        offset = 0
+        count = samples.shape[1]
+        while offset < count:
+            # Copy up to the next segment boundary or the end of the ring.
+            n = min(count - offset, self._step - self._pending, window - self._pos)
+            chunk = samples[:, offset:offset + n]
+            self._buffer[:, self._pos:self._pos + n] = chunk
+            self._buffer[:, self._pos + window:self._pos + window + n] = chunk
+            self._pos = (self._pos + n) % window
+            self._filled = min(window, self._filled + n)
+            self._pending += n
+            offset += n
+            if self._pending == self._step:
+                self._pending = 0
+                if self._filled == window:
+                    self._segment()
+
+    def _segment(self):
+        segment = self._buffer[:, self._pos:self._pos + self._window]
+        segment = (segment - segment.mean(axis=1, keepdims=True)) * self._taper
+        power = np.abs(np.fft.rfft(segment, axis=1)) ** 2
+        power[:, 1:] *= 2.0
+        if self._window % 2 == 0:
+            power[:, -1] /= 2.0
+        # Plain mean until `averages` segments are in, exponential after.
+        self.segments += 1
+        alpha = 1.0 / min(self.segments, self._averages)
+        self._psd += alpha * (power - self._psd)
+        gyro = power[3:, 1:].sum(axis=0)
+        self._history.append((self.motor, self.frequencies[1 + int(np.argmax(gyro))]))
+
+    """Power spectral density of one axis (or all axes) in units^2/Hz"""
+    def psd(self, axis=None):
+        scale = 1.0 / ((self.sampleRate or 1.0) * self._taper_power)
+        if axis is None:
+            return self._psd * scale
+        return self._psd[self.AXES.index(axis)] * scale
+
+    """Strongest local maxima of an axis as a list of (frequency, power)"""
+    def peaks(self, axis, count=3, min_freq=0.0):
+        psd = self.psd(axis)
+        freqs = self.frequencies
+        if self.segments == 0:
+            return []
+        local = np.zeros(psd.shape, dtype=bool)
+        local[1:-1] = (psd[1:-1] > psd[:-2]) & (psd[1:-1] >= psd[2:])
+        local &= freqs >= min_freq
+        index = np.flatnonzero(local)
+        index = index[np.argsort(psd[index])[::-1][:count]]
+        return [(float(freqs[i]), float(psd[i])) for i in index]
+
+    """Notch filter suggestions from the gyro peaks"""
+    """Each suggestion is centred on a peak, with the cutoff placed at the
+    lower half-power point of that peak."""
+    def notchSuggestions(self, count=2, min_freq=80.0):
+        freqs = self.frequencies
+        suggestions = []
+        for axis in ['gx','gy','gz']:
+            psd = self.psd(axis)
+            for (center, power) in self.peaks(axis, count, min_freq):
+                i = int(np.searchsorted(freqs, center))
+                while i > 0 and psd[i] > power / 2.0:
+                    i -= 1
+                suggestions.append({'axis':axis,'center':round(center),'cutoff':round(float(freqs[i])),'power':power})
+        suggestions.sort(key=lambda s: s['power'], reverse=True)
+        return suggestions
+
+    """Correlation between mean motor output and dominant gyro frequency"""
+    def motorCorrelation(self):
+        if len(self._history) < 3:
+            return 0.0
+        history = np.array(self._history)
+        if np.ptp(history[:, 0]) == 0 or np.ptp(history[:, 1]) == 0:
+            return 0.0
+        return float(np.corrcoef(history[:, 0], history[:, 1])[0, 1])
+
+    def reset(self):
+        self._buffer[:] = 0
+        self._psd[:] = 0
+        self._pos = 0
+        self._filled = 0
+        self._pending = 0
+        self.segments = 0
+        self._history.clear()
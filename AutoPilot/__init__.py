@@ -1,3 +1,4 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from AutoPilot.MultiWii import MultiWii
\ No newline at end of file
+from AutoPilot.MultiWii import MultiWii
+from AutoPilot.SpectrumAnalyzer import SpectrumAnalyzer
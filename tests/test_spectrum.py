@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+from AutoPilot.SpectrumAnalyzer import SpectrumAnalyzer
+
+import pytest
+import numpy as np
+
+@pytest.mark.parametrize('sample_rate', [(500.0)])
+class TestSpectrumAnalyzer():
+    def test_peak(self, sample_rate):
+        analyzer = SpectrumAnalyzer(sample_rate=sample_rate, window=256)
+        t = np.arange(4096) / sample_rate
+        samples = np.zeros((len(t), 6))
+        samples[:, 2] = 512 + 20 * np.sin(2 * np.pi * 60.0 * t)
+        samples[:, 4] = 50 * np.sin(2 * np.pi * 150.0 * t)
+        analyzer.addSamples(samples)
+        (freq, power) = analyzer.peaks('gy', count=1)[0]
+        assert abs(freq - 150.0) < sample_rate / 256
+        assert abs(analyzer.peaks('az', count=1)[0][0] - 60.0) < sample_rate / 256
+        notch = analyzer.notchSuggestions(count=1)[0]
+        assert notch['axis'] == 'gy'
+        assert notch['cutoff'] <= notch['center']
+
+    def test_streaming_matches_block(self, sample_rate):
+        samples = np.random.RandomState(0).randn(1000, 6)
+        block = SpectrumAnalyzer(sample_rate=sample_rate)
+        block.addSamples(samples)
+        stream = SpectrumAnalyzer(sample_rate=sample_rate)
+        for s in samples:
+            stream.addRawIMU(dict(zip(SpectrumAnalyzer.AXES, s)))
+        assert stream.segments == block.segments == 6
+        assert np.allclose(stream.psd(), block.psd())
+
+    def test_motor_correlation(self, sample_rate):
+        analyzer = SpectrumAnalyzer(sample_rate=sample_rate, window=128, overlap=0)
+        t = np.arange(128) / sample_rate
+        for (throttle, freq) in [(1200, 80.0), (1400, 120.0), (1600, 160.0), (1800, 200.0)]:
+            analyzer.addMotor({'m1':throttle,'m2':throttle,'m3':throttle,'m4':throttle,'m5':0,'m6':0,'m7':0,'m8':0})
+            samples = np.zeros((len(t), 6))
+            samples[:, 3] = 100 * np.sin(2 * np.pi * freq * t)
+            analyzer.addSamples(samples)
+        assert analyzer.motorCorrelation() > 0.9